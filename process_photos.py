@@ -8,13 +8,22 @@ catalog entries with OCR, descriptions, and metadata.
 """
 
 import os
-import json
+import io
+import asyncio
+import base64
+import errno
 import hashlib
+import mmap
 import shutil
+import re
+import string
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from PIL import Image
+from PIL import Image, ImageOps
 import anthropic
+import orjson
 
 # Configuration
 CATALOG_DIR = Path(__file__).parent
@@ -26,9 +35,38 @@ UPDATES_DIR = DATA_DIR / "updates"
 BASE_JSON = DATA_DIR / "items.base.json"
 UPDATES_INDEX = DATA_DIR / "updates_index.json"
 BOX_KEY = DATA_DIR / "box_key.json"
+HASH_INDEX_CACHE = DATA_DIR / ".hash_index.json"
+NEXT_ID_PATH = DATA_DIR / "next_id.json"
 
 THUMBNAIL_MAX_SIZE = (512, 512)
 
+# Pillow box-reduces (and JPEG-drafts) to within this factor of the target
+# before the LANCZOS pass; lower is faster at a small cost in sharpness
+THUMBNAIL_REDUCING_GAP = 1.5
+
+# Images sent to Claude Vision are downscaled to fit this box (the model
+# resizes anything larger anyway) and re-encoded as JPEG
+API_IMAGE_MAX_SIZE = (1568, 1568)
+
+# os.link errors that mean hardlinks aren't available (cross-device, unsupported
+# filesystem), where --hardlink falls back to copying
+HARDLINK_UNSUPPORTED_ERRNOS = {errno.EXDEV, errno.EPERM, errno.ENOTSUP, errno.EOPNOTSUPP}
+
+# Files above this size are hashed through mmap instead of buffered reads
+MMAP_HASH_THRESHOLD = 1024 * 1024
+
+# Number of API requests kept in flight at once
+MAX_CONCURRENT_REQUESTS = 16
+
+# With that many requests in flight, rate limits (429) and overload errors
+# are expected; the SDK retries them with backoff, honouring retry-after
+API_MAX_RETRIES = 8
+
+# claude-3-5-sonnet-20241022 returns at most 8192 output tokens, which
+# covers roughly four photos' worth of catalog entries per request
+MAX_OUTPUT_TOKENS = 8192
+MAX_IMAGES_PER_REQUEST = 4
+
 # Box category mappings
 BOX_CATEGORIES = {
     "DO": "Documents",
@@ -56,43 +94,197 @@ LOCATIONS = {
     "S": "Storage Room"
 }
 
+# Claude Vision prompt; {FAMILY} is replaced with the family names to watch for
+ANALYSIS_PROMPT = """Analyze this household archive item photo and extract the following information:
+
+1. **Box ID Label**: Look for any label/sticker showing a box code (format: CC##[Location], e.g., DO3M, KT2L)
+   - CC = 2-letter category code
+   - ## = box number
+   - [Location] = optional location code (L, M, G1, G2, S)
+
+2. **Items visible**: List all distinct items you can see in this photo
+
+3. **For each item**, provide:
+   - Item name (short, clear)
+   - Detailed description (museum-quality, family-archive tone)
+   - Category (use format: MainCategory > SubCategory)
+   - Any visible text (OCR)
+   - Estimated quantity
+   - Any people mentioned in documents/photos
+   - Suggested tags
+   - Conservation notes if applicable
+
+4. **If this is a publication** (newspaper, magazine):
+   - Publication name
+   - Date of issue (if visible)
+   - Page number
+   - Names mentioned{FAMILY}
+
+Respond in JSON format:
+{
+  "box_id": "detected box ID or null",
+  "box_id_confidence": "high/medium/low",
+  "items": [
+    {
+      "item_name": "...",
+      "category": "...",
+      "description": "...",
+      "quantity": 1,
+      "notes": "...",
+      "captions": ["..."],
+      "people": ["..."],
+      "tags": ["..."],
+      "pub": {
+        "publication_name": "...",
+        "date_of_issue": "...",
+        "page_number": "...",
+        "names_mentioned": ["..."]
+      } or null,
+      "ocr_text": "any visible text"
+    }
+  ]
+}"""
+ANALYSIS_PROMPT_NO_FAMILY = ANALYSIS_PROMPT.replace("{FAMILY}", "")
+
+# Box codes: 2-letter category, box number, optional location (e.g. DO3M, AN4G1)
+BOX_ID_PATTERN = re.compile(r'^([A-Z]{2})\d+(G1|G2|[LMS])?$')
+
+# Maps every ASCII character that isn't allowed in a filename slug to '-'
+SLUG_TRANSLATION = str.maketrans({
+    chr(c): '-' for c in range(128) if chr(c) not in string.ascii_lowercase + string.digits
+})
+
+
+def write_json(path, data, indent=True):
+    """Write data to path as UTF-8 JSON, indented unless indent is False
+
+    Writes to a temp file first and swaps it in with os.replace, so a crash
+    mid-write never leaves a truncated file behind.
+    """
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else None))
+    os.replace(tmp_path, path)
+
+
+def catalog_mtimes():
+    """Get modification times that change whenever the catalog is saved
+
+    Cached catalog data stores these and is only reused while they match.
+    """
+    return [path.stat().st_mtime_ns if path.exists() else None for path in (BASE_JSON, UPDATES_INDEX)]
+
+
+@lru_cache(maxsize=None)
+def box_friendly_name(box_id):
+    """Get the friendly "Category - Location" name for a box ID"""
+    match = BOX_ID_PATTERN.match(box_id)
+    if match:
+        box_category, box_location = match.groups()
+    else:
+        # Loosely formatted IDs (e.g. "DO3-M", "DO 3M") can still end in a location code
+        box_category = box_id[:2] if len(box_id) >= 2 else "UNK"
+        box_location = None
+        if len(box_id) > 2:
+            box_location = next((code for code in (box_id[-2:], box_id[-1:]) if code in LOCATIONS), None)
+
+    box_friendly = BOX_CATEGORIES.get(box_category, "Unknown")
+    if box_location:
+        box_friendly += f" - {LOCATIONS[box_location]}"
+    return box_friendly
+
 
 class CatalogProcessor:
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, rewrite_base=True, images_per_request=1, hardlink=False):
         self.api_key = api_key or os.environ.get("ANTHROPIC_API_KEY")
         if not self.api_key:
             print("Warning: No Anthropic API key found. Set ANTHROPIC_API_KEY environment variable.")
             print("OCR and AI descriptions will not be available.")
-        else:
-            self.client = anthropic.Anthropic(api_key=self.api_key)
 
+        self.client = None  # AsyncAnthropic client, created per event loop in run_analysis
+
+        self.rewrite_base = rewrite_base
+        self.images_per_request = max(1, min(images_per_request, MAX_IMAGES_PER_REQUEST))
+        self.hardlink = hardlink
+        self.start_batch_clock()
         self.catalog_data = self.load_catalog()
         self.existing_hashes = self.build_hash_index()
         self.new_items = []
         self.updated_items = []
         self.item_counter = self.get_next_item_id()
 
+    def start_batch_clock(self):
+        """Capture the batch timestamp and the date strings derived from it
+
+        Every item in a batch shares these, so IDs and filenames from one
+        batch carry the same date prefix.
+        """
+        self._batch_start = datetime.now()
+        self._date_iso = self._batch_start.strftime("%Y-%m-%d")
+        self._date_ymd = self._batch_start.strftime("%Y%m%d")
+
     def load_catalog(self):
         """Load existing catalog data"""
         if BASE_JSON.exists():
-            with open(BASE_JSON, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return {
-            "catalog_version": datetime.now().strftime("%Y.%m.%d.%H%M"),
-            "source": "Stephen Household Archive",
-            "items": []
-        }
+            catalog = orjson.loads(BASE_JSON.read_bytes())
+        else:
+            catalog = {
+                "catalog_version": datetime.now().strftime("%Y.%m.%d.%H%M"),
+                "source": "Stephen Household Archive",
+                "items": []
+            }
+
+        self.merge_delta_items(catalog)
+        return catalog
+
+    def merge_delta_items(self, catalog):
+        """Add items from delta files that the base catalog doesn't have yet
+
+        The base file can lag behind the deltas when batches are run with
+        --no-rewrite-base.
+        """
+        if not UPDATES_INDEX.exists():
+            return
+
+        known_ids = {item.get("id") for item in catalog["items"]}
+        for delta_filename in orjson.loads(UPDATES_INDEX.read_bytes()).get("deltas", []):
+            delta_path = UPDATES_DIR / delta_filename
+            if not delta_path.exists():
+                continue
+            for item in orjson.loads(delta_path.read_bytes()).get("added", []):
+                if item.get("id") not in known_ids:
+                    catalog["items"].append(item)
+                    known_ids.add(item.get("id"))
 
     def build_hash_index(self):
-        """Build index of existing image hashes"""
-        hashes = {}
-        for item in self.catalog_data.get("items", []):
-            if item.get("hashes", {}).get("sha1"):
-                hashes[item["hashes"]["sha1"]] = item["id"]
+        """Build index of existing image hashes, reusing the cached copy if current"""
+        mtimes = catalog_mtimes()
+        if HASH_INDEX_CACHE.exists():
+            try:
+                cache = orjson.loads(HASH_INDEX_CACHE.read_bytes())
+                if cache.get("mtimes") == mtimes:
+                    return cache["hashes"]
+            except (orjson.JSONDecodeError, KeyError):
+                pass
+
+        hashes = {
+            item["hashes"]["sha1"]: item["id"]
+            for item in self.catalog_data.get("items", ())
+            if item.get("hashes", {}).get("sha1")
+        }
+        write_json(HASH_INDEX_CACHE, {"mtimes": mtimes, "hashes": hashes}, indent=False)
         return hashes
 
     def get_next_item_id(self):
         """Get next available item ID"""
+        # Use the counter saved with the catalog unless the files changed since
+        if NEXT_ID_PATH.exists():
+            try:
+                saved = orjson.loads(NEXT_ID_PATH.read_bytes())
+                if saved.get("mtimes") == catalog_mtimes():
+                    return saved["next"]
+            except (orjson.JSONDecodeError, KeyError):
+                pass
+
         existing_items = self.catalog_data.get("items", [])
         if not existing_items:
             return 1
@@ -111,118 +303,138 @@ class CatalogProcessor:
 
     def calculate_sha1(self, file_path):
         """Calculate SHA1 hash of file"""
-        sha1 = hashlib.sha1()
         with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size > MMAP_HASH_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    return hashlib.sha1(mm).hexdigest()
+
+            if hasattr(hashlib, "file_digest"):  # Python 3.11+
+                return hashlib.file_digest(f, "sha1").hexdigest()
+
+            sha1 = hashlib.sha1()
             while True:
                 data = f.read(65536)
                 if not data:
                     break
                 sha1.update(data)
-        return sha1.hexdigest()
+            return sha1.hexdigest()
+
+    def copy_image(self, image_path, new_image_path):
+        """Copy image into the catalog, hardlinking instead when enabled
+
+        The file is created under a temporary name and moved into place with
+        os.replace. An existing target may be a hardlink to someone's original
+        photo, so it is replaced, never written through.
+        """
+        tmp_path = new_image_path.with_name(new_image_path.name + ".tmp")
+        tmp_path.unlink(missing_ok=True)
+
+        linked = False
+        if self.hardlink:
+            try:
+                os.link(image_path, tmp_path)
+                linked = True
+            except OSError as e:
+                # Only fall back to copying when linking isn't possible here
+                if e.errno not in HARDLINK_UNSUPPORTED_ERRNOS:
+                    raise
+        if not linked:
+            shutil.copy2(image_path, tmp_path)
+
+        os.replace(tmp_path, new_image_path)
+
+    def _load_image(self, image_path):
+        """Read and decode an image for the API request and thumbnail
+
+        Returns an upright RGB image already downscaled to
+        API_IMAGE_MAX_SIZE, or None when the file cannot be decoded.
+        """
+        with open(image_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size > MMAP_HASH_THRESHOLD:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                data = f.read()
 
-    def create_thumbnail(self, image_path, thumb_path):
-        """Create thumbnail for image"""
         try:
-            with Image.open(image_path) as img:
-                img.thumbnail(THUMBNAIL_MAX_SIZE, Image.Resampling.LANCZOS)
-                img.save(thumb_path, quality=85, optimize=True)
-            return True
+            source = data if isinstance(data, mmap.mmap) else io.BytesIO(data)
+            with Image.open(source) as img:
+                # Let libjpeg decode at a reduced DCT scale (no-op for PNG). Ask
+                # for the size thumbnail() will produce so it scales down as far
+                # as possible without going below it
+                scale = min(API_IMAGE_MAX_SIZE[0] / img.width, API_IMAGE_MAX_SIZE[1] / img.height, 1)
+                img.draft("RGB", (round(img.width * scale), round(img.height * scale)))
+                img.thumbnail(API_IMAGE_MAX_SIZE, Image.Resampling.LANCZOS, reducing_gap=THUMBNAIL_REDUCING_GAP)
+                return ImageOps.exif_transpose(img).convert("RGB")
         except Exception as e:
-            print(f"Error creating thumbnail for {image_path}: {e}")
-            return False
-
-    def encode_image(self, image_path):
-        """Encode image to base64 for API"""
-        import base64
-        with open(image_path, "rb") as f:
-            return base64.standard_b64encode(f.read()).decode("utf-8")
-
-    def analyze_image_with_ai(self, image_path, family_names=None):
-        """Use Claude Vision to analyze image and extract information"""
-        if not self.api_key:
-            return self.create_fallback_item(image_path)
+            print(f"Error decoding {image_path}: {e}")
+            return None
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+
+    def create_thumbnail_from_pil(self, img):
+        """Create JPEG thumbnail bytes from a decoded image"""
+        thumb = img.copy()
+        thumb.thumbnail(THUMBNAIL_MAX_SIZE, Image.Resampling.LANCZOS, reducing_gap=THUMBNAIL_REDUCING_GAP)
+        buffer = io.BytesIO()
+        thumb.save(buffer, format="JPEG", quality=85, optimize=True)
+        return buffer.getvalue()
+
+    def encode_image(self, img):
+        """Encode a decoded image as JPEG base64 for API"""
+        buffer = io.BytesIO()
+        img.save(buffer, format="JPEG", quality=85)
+        # Encode straight from the buffer's memory instead of a getvalue() copy
+        return base64.b64encode(buffer.getbuffer()).decode("ascii")
+
+    def build_analysis_prompt(self, family_names=None):
+        """Build the Claude Vision prompt for one photo's analysis"""
+        if not family_names:
+            return ANALYSIS_PROMPT_NO_FAMILY
+        return ANALYSIS_PROMPT.replace("{FAMILY}", f"\n\nFamily names to watch for: {', '.join(family_names)}")
+
+    async def analyze_images_with_ai(self, image_paths, images, family_names=None):
+        """Analyze one or more images in a single Claude Vision request
+
+        Returns one result per image, in order. Images that could not be
+        decoded get fallback items. When the request fails or its response
+        cannot be parsed, the sent photos' fallback items are marked "retry"
+        so they are left out of the catalog and sent again next run.
+        """
+        results = [self.create_fallback_item(image_path) for image_path in image_paths]
+        pending = [idx for idx, img in enumerate(images) if img is not None]
+        if not self.api_key or not pending:
+            return results
 
         try:
-            image_data = self.encode_image(image_path)
-
-            # Determine media type
-            ext = Path(image_path).suffix.lower()
-            media_type = "image/jpeg" if ext in ['.jpg', '.jpeg'] else "image/png"
-
-            family_names_text = ""
-            if family_names:
-                family_names_text = f"\n\nFamily names to watch for: {', '.join(family_names)}"
-
-            prompt = f"""Analyze this household archive item photo and extract the following information:
-
-1. **Box ID Label**: Look for any label/sticker showing a box code (format: CC##[Location], e.g., DO3M, KT2L)
-   - CC = 2-letter category code
-   - ## = box number
-   - [Location] = optional location code (L, M, G1, G2, S)
-
-2. **Items visible**: List all distinct items you can see in this photo
-
-3. **For each item**, provide:
-   - Item name (short, clear)
-   - Detailed description (museum-quality, family-archive tone)
-   - Category (use format: MainCategory > SubCategory)
-   - Any visible text (OCR)
-   - Estimated quantity
-   - Any people mentioned in documents/photos
-   - Suggested tags
-   - Conservation notes if applicable
-
-4. **If this is a publication** (newspaper, magazine):
-   - Publication name
-   - Date of issue (if visible)
-   - Page number
-   - Names mentioned{family_names_text}
-
-Respond in JSON format:
-{{
-  "box_id": "detected box ID or null",
-  "box_id_confidence": "high/medium/low",
-  "items": [
-    {{
-      "item_name": "...",
-      "category": "...",
-      "description": "...",
-      "quantity": 1,
-      "notes": "...",
-      "captions": ["..."],
-      "people": ["..."],
-      "tags": ["..."],
-      "pub": {{
-        "publication_name": "...",
-        "date_of_issue": "...",
-        "page_number": "...",
-        "names_mentioned": ["..."]
-      }} or null,
-      "ocr_text": "any visible text"
-    }}
-  ]
-}}"""
-
-            message = self.client.messages.create(
+            content = []
+            for num, idx in enumerate(pending, 1):
+                if len(pending) > 1:
+                    content.append({"type": "text", "text": f"Photo {num}:"})
+                content.append({
+                    "type": "image",
+                    "source": {
+                        "type": "base64",
+                        "media_type": "image/jpeg",
+                        "data": await asyncio.to_thread(self.encode_image, images[idx]),
+                    },
+                })
+
+            prompt = self.build_analysis_prompt(family_names)
+            if len(pending) > 1:
+                prompt += (
+                    f"\n\nThere are {len(pending)} photos above. Analyze each photo separately and "
+                    "respond with a JSON array containing one object in the format above per photo, in order."
+                )
+            content.append({"type": "text", "text": prompt})
+
+            message = await self.client.messages.create(
                 model="claude-3-5-sonnet-20241022",
-                max_tokens=2000,
+                max_tokens=min(2000 * len(pending), MAX_OUTPUT_TOKENS),
                 messages=[
                     {
                         "role": "user",
-                        "content": [
-                            {
-                                "type": "image",
-                                "source": {
-                                    "type": "base64",
-                                    "media_type": media_type,
-                                    "data": image_data,
-                                },
-                            },
-                            {
-                                "type": "text",
-                                "text": prompt
-                            }
-                        ],
+                        "content": content,
                     }
                 ],
             )
@@ -230,20 +442,34 @@ Respond in JSON format:
             # Extract JSON from response
             response_text = message.content[0].text
 
-            # Try to find JSON in response
-            json_start = response_text.find('{')
-            json_end = response_text.rfind('}') + 1
+            # Try to find JSON in response (an array when several photos were sent)
+            open_char, close_char = ('[', ']') if len(pending) > 1 else ('{', '}')
+            json_start = response_text.find(open_char)
+            json_end = response_text.rfind(close_char) + 1
 
             if json_start >= 0 and json_end > json_start:
-                json_str = response_text[json_start:json_end]
-                return json.loads(json_str)
-            else:
-                print(f"Could not parse AI response as JSON: {response_text}")
-                return self.create_fallback_item(image_path)
+                parsed = orjson.loads(response_text[json_start:json_end])
+                if len(pending) == 1:
+                    parsed = [parsed]
+
+                # Expect one {"items": [...]} object per photo. A lone object
+                # sent back for several photos gets its inner items list
+                # picked up by find('['); that list fails this check too
+                if (isinstance(parsed, list) and len(parsed) == len(pending)
+                        and all(isinstance(ai_result, dict) and isinstance(ai_result.get("items"), list)
+                                for ai_result in parsed)):
+                    for idx, ai_result in zip(pending, parsed):
+                        results[idx] = ai_result
+                    return results
+
+            print(f"Could not parse AI response as JSON: {response_text}")
 
         except Exception as e:
             print(f"Error analyzing image with AI: {e}")
-            return self.create_fallback_item(image_path)
+
+        for idx in pending:
+            results[idx]["retry"] = True
+        return results
 
     def create_fallback_item(self, image_path):
         """Create basic item entry without AI"""
@@ -269,26 +495,80 @@ Respond in JSON format:
 
     def create_filename_slug(self, text):
         """Create URL-safe filename slug"""
-        import re
-        text = text.lower()
-        text = re.sub(r'[^a-z0-9]+', '-', text)
-        text = text.strip('-')
+        # Non-ASCII characters become '?' first, which the table maps to '-'
+        text = text.lower().encode('ascii', 'replace').decode('ascii').translate(SLUG_TRANSLATION)
+        text = '-'.join(part for part in text.split('-') if part)
         return text[:50]  # Limit length
 
-    def process_image(self, image_path, family_names=None):
-        """Process a single image"""
-        print(f"Processing: {image_path}")
+    def run_analysis(self, groups, family_names=None):
+        """Analyze groups of new images concurrently
+
+        Each group is sent as one API request. Returns (ai_result,
+        thumbnail) for every image, flattened in group order.
+        """
+        return asyncio.run(self._analyze_groups(groups, family_names))
 
-        # Calculate hash
-        sha1_hash = self.calculate_sha1(image_path)
+    async def _analyze_groups(self, groups, family_names=None):
+        """Run analyze_images for every group, at most MAX_CONCURRENT_REQUESTS at a time"""
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
 
-        # Check if already processed
+        async def analyze_group(group):
+            async with semaphore:
+                return await self.analyze_images(group, family_names)
+
+        # The client's connection pool belongs to this event loop
+        if self.api_key:
+            self.client = anthropic.AsyncAnthropic(api_key=self.api_key, max_retries=API_MAX_RETRIES)
+        try:
+            group_results = await asyncio.gather(*(analyze_group(group) for group in groups))
+        finally:
+            if self.client is not None:
+                await self.client.close()
+                self.client = None
+
+        return [result for results in group_results for result in results]
+
+    async def analyze_images(self, image_paths, family_names=None):
+        """Decode and analyze new images, sending them all in one API request
+
+        Returns (ai_result, thumbnail) for each image, in order.
+        """
+        for image_path in image_paths:
+            print(f"Analyzing: {image_path}")
+
+        # Read each file once for both the API image and the thumbnail,
+        # decoding in worker threads while other requests are in flight
+        images = await asyncio.gather(*(
+            asyncio.to_thread(self._load_image, image_path) for image_path in image_paths
+        ))
+
+        ai_results = await self.analyze_images_with_ai(image_paths, images, family_names)
+
+        results = []
+        for image_path, img, ai_result in zip(image_paths, images, ai_results):
+            thumbnail = None
+            if img is not None:
+                thumbnail = await asyncio.to_thread(self.create_thumbnail_from_pil, img)
+            results.append((ai_result, thumbnail))
+        return results
+
+    def add_image_items(self, image_path, sha1_hash, ai_result, thumbnail=None):
+        """Create catalog entries for an analyzed image"""
+        print(f"Processing: {image_path}")
+
+        # Check if already processed (also catches duplicates within a batch)
         if sha1_hash in self.existing_hashes:
             print(f"  ⊗ Duplicate (already in catalog as {self.existing_hashes[sha1_hash]})")
             return
 
-        # Analyze with AI
-        ai_result = self.analyze_image_with_ai(image_path, family_names)
+        if ai_result is None:
+            print("  ⊗ Duplicate (same photo as another in this batch)")
+            return
+
+        # Leave the hash unrecorded so the photo is sent again next run
+        if ai_result.get("retry"):
+            print("  ⚠ Analysis failed; skipped so it is retried on the next run")
+            return
 
         box_id = ai_result.get("box_id") or "UNK"
         detected_items = ai_result.get("items", [])
@@ -297,43 +577,35 @@ Respond in JSON format:
             print("  ⚠ No items detected")
             return
 
-        date_found = datetime.now().strftime("%Y-%m-%d")
+        date_found = self._date_iso
         base_filename = Path(image_path).stem
 
+        # Thumbnails are named by content, so every item from this photo
+        # (and any re-run of it) shares one file
+        thumb_filename = f"thumb_{sha1_hash[:16]}.jpg"
+        thumb_image_path = IMG_DIR / thumb_filename
+        if thumbnail is not None and not thumb_image_path.exists():
+            thumb_image_path.write_bytes(thumbnail)
+
         # Process each detected item
         for idx, item_data in enumerate(detected_items):
             item_num = idx + 1
-            item_id = f"it_{datetime.now().strftime('%Y%m%d')}_{self.item_counter:06d}"
+            item_id = f"it_{self._date_ymd}_{self.item_counter:06d}"
             self.item_counter += 1
 
             # Create renamed image filename
             slug = self.create_filename_slug(item_data["item_name"])
-            new_filename = f"{datetime.now().strftime('%Y%m%d')}_box-{box_id}_{slug}_n{item_num:02d}{Path(image_path).suffix}"
-            thumb_filename = f"thumb_{new_filename}"
+            new_filename = f"{self._date_ymd}_box-{box_id}_{slug}_n{item_num:02d}{Path(image_path).suffix}"
 
             # Copy and rename image
             new_image_path = IMG_DIR / new_filename
-            thumb_image_path = IMG_DIR / thumb_filename
-
-            shutil.copy2(image_path, new_image_path)
-            self.create_thumbnail(new_image_path, thumb_image_path)
-
-            # Get box friendly name
-            box_category = box_id[:2] if len(box_id) >= 2 else "UNK"
-            box_location = box_id[-2:] if len(box_id) > 2 and box_id[-2:] in LOCATIONS else box_id[-1:] if len(box_id) > 2 and box_id[-1:] in LOCATIONS else ""
-
-            category_name = BOX_CATEGORIES.get(box_category, "Unknown")
-            location_name = LOCATIONS.get(box_location, "")
-
-            box_friendly = f"{category_name}"
-            if location_name:
-                box_friendly += f" - {location_name}"
+            self.copy_image(image_path, new_image_path)
 
             # Create catalog entry
             catalog_entry = {
                 "id": item_id,
                 "box_id": box_id,
-                "box_friendly": box_friendly,
+                "box_friendly": box_friendly_name(box_id),
                 "category": item_data.get("category", "Uncategorized"),
                 "item_name": item_data.get("item_name", "Unknown Item"),
                 "quantity": item_data.get("quantity", 1),
@@ -378,20 +650,25 @@ Respond in JSON format:
             print("No changes to save")
             return None
 
-        delta_version = datetime.now().strftime("%Y-%m-%d")
+        delta_version = self._date_iso
         delta_filename = f"{delta_version}.json"
         delta_path = UPDATES_DIR / delta_filename
 
+        # Keep items added by earlier batches on the same day
+        added = self.new_items
+        if delta_path.exists():
+            added = orjson.loads(delta_path.read_bytes()).get("added", []) + added
+
         # Create changelog
         changelog_parts = []
-        if self.new_items:
+        if added:
             box_counts = {}
-            for item in self.new_items:
+            for item in added:
                 box_id = item["box_id"]
                 box_counts[box_id] = box_counts.get(box_id, 0) + 1
 
             box_summary = ", ".join(f"{box}:{count}" for box, count in sorted(box_counts.items()))
-            changelog_parts.append(f"Added {len(self.new_items)} items ({box_summary})")
+            changelog_parts.append(f"Added {len(added)} items ({box_summary})")
 
         if self.updated_items:
             changelog_parts.append(f"Updated {len(self.updated_items)} items")
@@ -400,22 +677,20 @@ Respond in JSON format:
 
         delta = {
             "delta_version": delta_version,
-            "added": self.new_items,
+            "added": added,
             "updated": self.updated_items,
             "removed": [],
             "changelog": changelog
         }
 
-        with open(delta_path, 'w', encoding='utf-8') as f:
-            json.dump(delta, f, indent=2, ensure_ascii=False)
+        write_json(delta_path, delta)
 
         return delta_filename
 
     def update_updates_index(self, delta_filename):
         """Update the updates index file"""
         if UPDATES_INDEX.exists():
-            with open(UPDATES_INDEX, 'r', encoding='utf-8') as f:
-                index = json.load(f)
+            index = orjson.loads(UPDATES_INDEX.read_bytes())
         else:
             index = {"last_updated": "", "deltas": []}
 
@@ -424,25 +699,25 @@ Respond in JSON format:
 
         index["last_updated"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-        with open(UPDATES_INDEX, 'w', encoding='utf-8') as f:
-            json.dump(index, f, indent=2)
+        write_json(UPDATES_INDEX, index, indent=False)
 
     def save_catalog(self):
         """Save catalog data"""
         # Update base catalog with new items
         self.catalog_data["items"].extend(self.new_items)
-        self.catalog_data["catalog_version"] = datetime.now().strftime("%Y.%m.%d.%H%M")
+        self.catalog_data["catalog_version"] = self._batch_start.strftime("%Y.%m.%d.%H%M")
 
-        # Backup existing base file
-        if BASE_JSON.exists():
-            backup_filename = f"items_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-            backup_path = ARCHIVE_DIR / backup_filename
-            shutil.copy2(BASE_JSON, backup_path)
-            print(f"Backed up catalog to: {backup_filename}")
+        # The deltas already record the new items, so the base file can wait
+        if self.rewrite_base:
+            # Backup existing base file
+            if BASE_JSON.exists():
+                backup_filename = f"items_{self._batch_start.strftime('%Y%m%d_%H%M%S')}.json"
+                backup_path = ARCHIVE_DIR / backup_filename
+                shutil.copy2(BASE_JSON, backup_path)
+                print(f"Backed up catalog to: {backup_filename}")
 
-        # Save updated base file
-        with open(BASE_JSON, 'w', encoding='utf-8') as f:
-            json.dump(self.catalog_data, f, indent=2, ensure_ascii=False)
+            # Save updated base file (compact; deltas stay indented for review)
+            write_json(BASE_JSON, self.catalog_data, indent=False)
 
         # Create delta file
         delta_filename = self.create_delta_file()
@@ -450,6 +725,12 @@ Respond in JSON format:
             self.update_updates_index(delta_filename)
             print(f"Created delta file: {delta_filename}")
 
+        # Save the ID counter and hash index last so they are stamped with
+        # the final mtimes and the next run can reuse them
+        mtimes = catalog_mtimes()
+        write_json(NEXT_ID_PATH, {"next": self.item_counter, "mtimes": mtimes}, indent=False)
+        write_json(HASH_INDEX_CACHE, {"mtimes": mtimes, "hashes": self.existing_hashes}, indent=False)
+
     def process_batch(self, photo_dir, family_names=None):
         """Process a batch of photos"""
         photo_path = Path(photo_dir)
@@ -470,8 +751,31 @@ Respond in JSON format:
 
         print(f"\nFound {len(image_files)} image(s) to process\n")
 
-        for image_file in sorted(image_files):
-            self.process_image(image_file, family_names)
+        self.start_batch_clock()
+
+        # Hash every photo up front (hashlib releases the GIL, so this runs
+        # on all cores) so duplicates never reach the API
+        image_files = sorted(image_files)
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            sha1_hashes = list(executor.map(self.calculate_sha1, image_files))
+
+        seen_hashes = set(self.existing_hashes)
+        new_files = []
+        for image_file, sha1_hash in zip(image_files, sha1_hashes):
+            if sha1_hash not in seen_hashes:
+                seen_hashes.add(sha1_hash)
+                new_files.append(image_file)
+
+        # Analyze new images concurrently, then add them to the catalog in
+        # sorted order so item IDs stay deterministic
+        groups = [
+            new_files[i:i + self.images_per_request]
+            for i in range(0, len(new_files), self.images_per_request)
+        ]
+        results = dict(zip(new_files, self.run_analysis(groups, family_names)))
+
+        for image_file, sha1_hash in zip(image_files, sha1_hashes):
+            self.add_image_items(image_file, sha1_hash, *results.get(image_file, (None, None)))
 
         # Save results
         if self.new_items or self.updated_items:
@@ -490,14 +794,24 @@ def main():
     parser.add_argument("photo_dir", help="Directory containing photos to process")
     parser.add_argument("--family-names", help="Comma-separated list of family names to watch for")
     parser.add_argument("--api-key", help="Anthropic API key (or set ANTHROPIC_API_KEY env var)")
+    parser.add_argument("--no-rewrite-base", action="store_true",
+                        help="Only write the delta file, leaving items.base.json untouched")
+    parser.add_argument("--images-per-request", type=int, default=1,
+                        help=f"Number of photos to send in each API request, 1-{MAX_IMAGES_PER_REQUEST} (default: 1)")
+    parser.add_argument("--hardlink", action="store_true",
+                        help="Hardlink photos into img/ instead of copying them (same filesystem only)")
 
     args = parser.parse_args()
 
+    if not 1 <= args.images_per_request <= MAX_IMAGES_PER_REQUEST:
+        parser.error(f"--images-per-request must be between 1 and {MAX_IMAGES_PER_REQUEST}")
+
     family_names = None
     if args.family_names:
         family_names = [name.strip() for name in args.family_names.split(',')]
 
-    processor = CatalogProcessor(api_key=args.api_key)
+    processor = CatalogProcessor(api_key=args.api_key, rewrite_base=not args.no_rewrite_base,
+                                 images_per_request=args.images_per_request, hardlink=args.hardlink)
     processor.process_batch(args.photo_dir, family_names)
 
 